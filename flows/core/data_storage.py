@@ -1,9 +1,57 @@
 from pathlib import Path
 import pandas as pd
 import json
+import gzip
+import orjson
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 import hashlib
+import secrets
+
+def load_generation_file(path: Path) -> Dict[str, Any]:
+    """Load a generation file written by the phase experiment
+    
+    Supports both the single-document JSON layout and the NDJSON stream, whose
+    first line holds the metadata and every following line a single state.
+    Either may be gzip-compressed (.gz suffix). NDJSON states that reference
+    a personality by personality_id are dereferenced against the
+    {"personality": {id: ...}} lines written ahead of them.
+    
+    Args:
+        path: Path to a .json, .jsonl or .jsonl.gz generation file
+        
+    Returns:
+        Dictionary with "metadata" and "states" entries
+    """
+    path = Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    if ".jsonl" not in path.suffixes:
+        with opener(path, "rb") as f:
+            return orjson.loads(f.read())
+        
+    metadata: Dict[str, Any] = {}
+    personalities: Dict[str, Any] = {}
+    states: List[Dict[str, Any]] = []
+    with opener(path, "rb") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = orjson.loads(line)
+            if "metadata" in record:
+                metadata = record["metadata"]
+            elif len(record) == 1 and "personality" in record:
+                personalities.update(record["personality"])
+            elif "personalities" in record:
+                # Older files wrote a single table after all the states
+                personalities.update(record["personalities"])
+            else:
+                states.append(record)
+                
+    for state in states:
+        if "personality_id" in state:
+            state["personality"] = personalities[str(state.pop("personality_id"))]
+            
+    return {"metadata": metadata, "states": states}
 
 class DataStorage:
     def __init__(self, base_dir: str = "data"):
@@ -39,7 +87,7 @@ class DataStorage:
         # Create unique identifier for this generation
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         param_hash = hashlib.md5(str(parameters).encode()).hexdigest()[:8]
-        generation_id = f"{experiment_name}_{timestamp}_{param_hash}"
+        generation_id = f"{experiment_name}_{timestamp}_{param_hash}_{secrets.token_hex(4)}"
         
         # Save data as CSV
         df = pd.DataFrame(data)
@@ -60,7 +108,7 @@ class DataStorage:
         
         metadata_path = self.metadata_dir / f"{generation_id}.json"
         with open(metadata_path, 'w') as f:
-            json.dump(metadata, f, indent=2)
+            f.write(json.dumps(metadata, indent=2))
             
         return generation_id
     
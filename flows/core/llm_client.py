@@ -1,26 +1,106 @@
 from openai import AsyncOpenAI
+import httpx
 from typing import Optional, Dict, Any, List
 import os
+import time
+import orjson
+from pathlib import Path
 from tenacity import retry, stop_after_attempt, wait_exponential
 import asyncio
 
+class AsyncRateLimiter:
+    """Spaces out requests so they never exceed a queries-per-minute budget"""
+    
+    def __init__(self, qpm: float):
+        """Initialize the rate limiter
+        
+        Args:
+            qpm: Maximum number of queries per minute
+        """
+        self.interval = 60.0 / qpm
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+        
+    async def acquire(self):
+        """Wait until the next request slot is available"""
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
 class LLMClient:
     """Asynchronous OpenAI client wrapper with retry logic"""
     
     def __init__(self, api_key: Optional[str] = None, 
                  max_retries: int = 3,
-                 retry_delay: float = 1.0):
+                 retry_delay: float = 1.0,
+                 cache_path: Optional[str] = None,
+                 qpm: Optional[float] = None):
         """Initialize the LLM client
         
         Args:
             api_key: Optional API key. If not provided, will use OPENAI_API_KEY env variable
             max_retries: Maximum number of retry attempts
             retry_delay: Delay between retry attempts in seconds
+            cache_path: Optional JSON file for caching responses. Caching is disabled if not provided
+            qpm: Optional queries-per-minute limit applied to every API call
         """
-        self.client = AsyncOpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
+        # HTTP/2 multiplexes concurrent requests over one pooled TLS connection
+        self.client = AsyncOpenAI(
+            api_key=api_key or os.getenv("OPENAI_API_KEY"),
+            http_client=httpx.AsyncClient(
+                http2=True,
+                timeout=httpx.Timeout(60.0),
+                limits=httpx.Limits(max_connections=128, max_keepalive_connections=128)
+            )
+        )
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self.default_model = "gpt-4"
+        self.rate_limiter = AsyncRateLimiter(qpm) if qpm else None
+        
+        # Response cache keyed on the model, prompts, temperature and request options
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.cache: Optional[Dict[str, str]] = None
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._cache_dirty = False
+        self._flush_task: Optional[asyncio.Task] = None
+        if self.cache_path is not None:
+            self.cache = orjson.loads(self.cache_path.read_bytes()) if self.cache_path.exists() else {}
+        
+    async def aclose(self):
+        """Flush pending cache writes, then close the pooled HTTP connections"""
+        if self._flush_task is not None:
+            await self._flush_task
+        await self.client.close()
+        
+    def _cache_key(self, prompt: str, system_prompt: Optional[str], temperature: float,
+                   max_tokens: int, model: str, options: Dict[str, Any]) -> str:
+        """Build the cache key used by llm_cache.json"""
+        return orjson.dumps(
+            [model, max_tokens, prompt, system_prompt, round(temperature, 3), options],
+            option=orjson.OPT_SORT_KEYS
+        ).decode()
+        
+    def _save_cache(self):
+        """Schedule the response cache to be persisted
+        
+        Writes happen off the event loop, and saves requested while one is in
+        progress are coalesced into a single follow-up write.
+        """
+        self._cache_dirty = True
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self._flush_cache())
+            
+    async def _flush_cache(self):
+        """Write the response cache to disk until no changes are pending"""
+        while self._cache_dirty:
+            self._cache_dirty = False
+            # Snapshot on the loop so the write never sees the dict mid-update
+            data = orjson.dumps(self.cache, option=orjson.OPT_INDENT_2)
+            await asyncio.to_thread(self.cache_path.write_bytes, data)
         
     async def generate(
         self,
@@ -31,7 +111,7 @@ class LLMClient:
         model: Optional[str] = None,
         **kwargs
     ) -> str:
-        """Generate a response asynchronously with retry logic
+        """Generate a response asynchronously, served from the cache when enabled
         
         Args:
             prompt: The user prompt
@@ -44,6 +124,44 @@ class LLMClient:
         Returns:
             Generated text response
         """
+        if self.cache is None:
+            return await self._generate_uncached(prompt, system_prompt, temperature, max_tokens, model, **kwargs)
+            
+        key = self._cache_key(prompt, system_prompt, temperature, max_tokens,
+                              model or self.default_model, kwargs)
+        if key in self.cache:
+            return self.cache[key]
+            
+        # Identical concurrent requests share a single API call; shield it so
+        # cancelling one caller doesn't cancel the call for the others
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._generate_uncached(prompt, system_prompt, temperature, max_tokens, model, **kwargs)
+            )
+            self._pending[key] = task
+            
+            def forget(done: asyncio.Future):
+                if self._pending.get(key) is done:
+                    del self._pending[key]
+            task.add_done_callback(forget)
+        response = await asyncio.shield(task)
+            
+        if response and not response.startswith("Error:") and key not in self.cache:
+            self.cache[key] = response
+            self._save_cache()
+        return response
+        
+    async def _generate_uncached(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 100,
+        model: Optional[str] = None,
+        **kwargs
+    ) -> str:
+        """Call the API with retry logic"""
         attempt = 0
         while attempt < self.max_retries:
             try:
@@ -54,6 +172,9 @@ class LLMClient:
                     
                 messages.append({"role": "user", "content": prompt})
                 
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.acquire()
+                    
                 response = await self.client.chat.completions.create(
                     model=model or self.default_model,
                     messages=messages,
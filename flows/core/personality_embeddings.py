@@ -47,7 +47,7 @@ class PersonalityEmbeddingLibrary:
     def _save_metadata(self):
         """Save PCA model and vocabulary"""
         with open(self.vocab_path, 'w') as f:
-            json.dump(list(self.vocabulary), f)
+            f.write(json.dumps(list(self.vocabulary)))
             
         if self.pca_model is not None:
             with open(self.pca_model_path, 'wb') as f:
@@ -70,8 +70,10 @@ class PersonalityEmbeddingLibrary:
         try:
             self.logger.info(f"Fetching embedding for: {text[:50]}...")
             
-            # New OpenAI API format
-            response = self.client.embeddings.create(
+            # The client is synchronous, so run it in a thread to let
+            # concurrent embedding requests overlap
+            response = await asyncio.to_thread(
+                self.client.embeddings.create,
                 model="text-embedding-ada-002",
                 input=text
             )
@@ -101,9 +103,11 @@ class PersonalityEmbeddingLibrary:
             i_g = ' '.join(i_g)
             
         # Get embeddings
-        i_s_embed = await self.get_embedding(str(i_s))
-        i_g_embed = await self.get_embedding(str(i_g))
-        i_w_embed = await self.get_embedding(str(i_w))
+        i_s_embed, i_g_embed, i_w_embed = await asyncio.gather(
+            self.get_embedding(str(i_s)),
+            self.get_embedding(str(i_g)),
+            self.get_embedding(str(i_w))
+        )
         
         # Stack embeddings
         all_embeddings = np.vstack([i_s_embed, i_g_embed, i_w_embed])
@@ -129,6 +133,14 @@ class PersonalityEmbeddingLibrary:
         """Compute cosine similarity between two personality vectors"""
         return 1 - (self.compute_angle(vec1, vec2) / np.pi)
 
+    def compute_similarity_matrix(self, vectors: np.ndarray) -> np.ndarray:
+        """Compute pairwise similarities between rows of a vector matrix
+        
+        Vectorized equivalent of compute_similarity over every pair of rows.
+        """
+        unit = vectors / np.clip(norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        return 1 - (np.arccos(np.clip(unit @ unit.T, -1.0, 1.0)) / np.pi)
+
     def get_vocabulary_stats(self) -> Dict:
         """Get statistics about cached embeddings"""
         return {
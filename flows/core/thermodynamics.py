@@ -1,8 +1,9 @@
 from dataclasses import dataclass
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple
+from functools import lru_cache
 import numpy as np
+from collections import Counter
 from scipy import stats
-from scipy.stats import entropy
 
 @dataclass
 class ThermodynamicParameters:
@@ -13,6 +14,53 @@ class ThermodynamicParameters:
     noise_scale: float = 0.1
     epsilon: float = 1e-10 # Numerical stability factor
 
+def _shannon_entropy(counts: Counter) -> float:
+    """Shannon entropy (in nats) of a frequency table"""
+    freq = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+    p = freq / freq.sum()
+    return float(-(p * np.log(p)).sum())
+
+def _measure_coherence(response: str) -> float:
+    """Enhanced coherence measurement using multiple metrics"""
+    words = response.split()
+    if not words:
+        return 0.0
+        
+    # Lexical diversity
+    unique_ratio = len(set(words)) / len(words)
+    
+    # Structural coherence (simple approximation)
+    sent_lengths = [len(sent.split()) for sent in response.split('.') if sent.strip()]
+    length_variance = np.var(sent_lengths) if sent_lengths else 0
+    structural_coherence = 1 / (1 + length_variance)
+    
+    # Combine metrics
+    return 0.7 * unique_ratio + 0.3 * structural_coherence
+
+def _calculate_entropy(response: str) -> float:
+    """Calculate information entropy using character and word distributions"""
+    if not response:
+        return 0.0
+        
+    # Character-level entropy
+    char_entropy = _shannon_entropy(Counter(response))
+    
+    # Word-level entropy
+    words = response.split()
+    word_entropy = _shannon_entropy(Counter(words)) if words else 0
+    
+    # Combine both entropy measures
+    return 0.3 * char_entropy + 0.7 * word_entropy
+
+@lru_cache(maxsize=8192)
+def _response_stats(response: str) -> Tuple[float, float]:
+    """Coherence and entropy of a response
+    
+    Both depend only on the text, so they are memoized; cached and repeated
+    responses skip the word-level passes entirely.
+    """
+    return _measure_coherence(response), _calculate_entropy(response)
+
 class PersonalityThermodynamics:
     """Enhanced thermodynamics calculator with improved temperature handling"""
     
@@ -33,8 +81,7 @@ class PersonalityThermodynamics:
         and phase transition detection
         """
         # Calculate base metrics with improved coherence measure
-        coherence = self._measure_coherence(response)
-        entropy = self._calculate_entropy(response)
+        coherence, entropy = _response_stats(response)
         
         # Calculate order parameter for phase transition detection
         order_param = self._calculate_order_parameter(coherence, temperature)
@@ -63,40 +110,6 @@ class PersonalityThermodynamics:
         }
         return result
 
-    def _measure_coherence(self, response: str) -> float:
-        """Enhanced coherence measurement using multiple metrics"""
-        words = response.split()
-        if not words:
-            return 0.0
-            
-        # Lexical diversity
-        unique_ratio = len(set(words)) / len(words)
-        
-        # Structural coherence (simple approximation)
-        sent_lengths = [len(sent.split()) for sent in response.split('.') if sent.strip()]
-        length_variance = np.var(sent_lengths) if sent_lengths else 0
-        structural_coherence = 1 / (1 + length_variance)
-        
-        # Combine metrics
-        return 0.7 * unique_ratio + 0.3 * structural_coherence
-
-    def _calculate_entropy(self, response: str) -> float:
-        """Calculate information entropy using character and word distributions"""
-        if not response:
-            return 0.0
-            
-        # Character-level entropy
-        char_freq = np.array([response.count(c) for c in set(response)])
-        char_entropy = entropy(char_freq)
-        
-        # Word-level entropy
-        words = response.split()
-        word_freq = np.array([words.count(w) for w in set(words)])
-        word_entropy = entropy(word_freq) if words else 0
-        
-        # Combine both entropy measures
-        return 0.3 * char_entropy + 0.7 * word_entropy
-
     def _calculate_order_parameter(self, coherence: float, temperature: float) -> float:
         """Calculate order parameter with critical behavior"""
         T_ratio = temperature / self.params.T_c
@@ -149,9 +162,9 @@ class PersonalityThermodynamics:
         T_diff = np.abs(temperature - self.params.T_c)
         critical_scale = 1.0 + 1.0 / (1.0 + T_diff)
         
-        # Combine normal and critical fluctuations
-        noise = np.random.normal(0, base_scale) + \
-                np.random.normal(0, base_scale * critical_scale * 0.1)
+        # Combine normal and critical fluctuations; the sum of the two independent
+        # gaussians is itself gaussian, so draw it once with the combined variance
+        noise = np.random.normal(0, base_scale * np.sqrt(1.0 + (critical_scale * 0.1) ** 2))
                 
         return energy + noise
 
@@ -165,8 +178,8 @@ class PersonalityThermodynamics:
 
     def validate_energy_landscape(self, states: List[Dict]) -> Dict[str, float]:
         """Validate energy landscape properties"""
-        temperatures = [s["temperature"] for s in states]
-        energies = [s["energy"] for s in states]
+        temperatures = np.fromiter((s["temperature"] for s in states), dtype=np.float64, count=len(states))
+        energies = np.fromiter((s["energy"] for s in states), dtype=np.float64, count=len(states))
         
         # Calculate correlation
         try:
@@ -174,10 +187,10 @@ class PersonalityThermodynamics:
         except:
             energy_temp_correlation = float('nan')
             
-        # Analyze phase transitions
-        sorted_states = sorted(states, key=lambda x: x["temperature"])
-        energies_arr = np.array([s["energy"] for s in sorted_states])
-        temps_arr = np.array([s["temperature"] for s in sorted_states])
+        # Analyze phase transitions; order the columns by temperature in one argsort
+        order = np.argsort(temperatures, kind='stable')
+        energies_arr = energies[order]
+        temps_arr = temperatures[order]
         d_energy = np.gradient(energies_arr, temps_arr)
         
         return {
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
-from typing import Dict
+from typing import Dict, Iterable, Iterator, List
+import numpy as np
 
 @dataclass
 class MCState:
@@ -10,4 +11,85 @@ class MCState:
     coherence: float
     personality: Dict
     phase: str
-    response: str = "" 
\ No newline at end of file
+    response: str = ""
+
+# Integer codes for the known phases, ordered with semi-coherent in the middle
+PHASE_CODES = {'coherent': 0, 'semi-coherent': 1, 'chaotic': 2}
+
+# Placeholder phases recorded for failed samples, coded after the known phases
+FALLBACK_PHASE_CODES = {'unknown': 3, 'error': 4}
+
+PHASE_NAMES = tuple({**PHASE_CODES, **FALLBACK_PHASE_CODES})
+_PHASE_LOOKUP = dict(zip(PHASE_NAMES, range(len(PHASE_NAMES))))
+
+def encode_phases(phases: List[str]) -> np.ndarray:
+    """Encode phase names as int8 codes, with -1 for unrecognized phases"""
+    return np.fromiter((_PHASE_LOOKUP.get(p, -1) for p in phases), dtype=np.int8, count=len(phases))
+
+def decode_phase(code: int) -> str:
+    """Phase name for an int8 phase code"""
+    return PHASE_NAMES[code] if code >= 0 else "other"
+
+@dataclass
+class MCStateBatch:
+    """Column-oriented collection of MCStates
+    
+    Numeric fields are float64 arrays and phases are encode_phases codes, so
+    analysis and plotting can work on whole columns at once.
+    """
+    temperature: np.ndarray
+    energy: np.ndarray
+    entropy: np.ndarray
+    enthalpy: np.ndarray
+    coherence: np.ndarray
+    phase: np.ndarray
+    personality: List[Dict]
+    response: List[str]
+    
+    @classmethod
+    def from_states(cls, states: Iterable[MCState]) -> 'MCStateBatch':
+        """Build a batch from MCState objects"""
+        states = list(states)
+        n = len(states)
+        return cls(
+            temperature=np.fromiter((s.temperature for s in states), dtype=np.float64, count=n),
+            energy=np.fromiter((s.energy for s in states), dtype=np.float64, count=n),
+            entropy=np.fromiter((s.entropy for s in states), dtype=np.float64, count=n),
+            enthalpy=np.fromiter((s.enthalpy for s in states), dtype=np.float64, count=n),
+            coherence=np.fromiter((s.coherence for s in states), dtype=np.float64, count=n),
+            phase=encode_phases([s.phase for s in states]),
+            personality=[s.personality for s in states],
+            response=[s.response for s in states]
+        )
+        
+    @classmethod
+    def from_json(cls, data: List[Dict]) -> 'MCStateBatch':
+        """Build a batch from parsed state records"""
+        n = len(data)
+        return cls(
+            temperature=np.fromiter((s['temperature'] for s in data), dtype=np.float64, count=n),
+            energy=np.fromiter((s['energy'] for s in data), dtype=np.float64, count=n),
+            entropy=np.fromiter((s['entropy'] for s in data), dtype=np.float64, count=n),
+            enthalpy=np.fromiter((s['enthalpy'] for s in data), dtype=np.float64, count=n),
+            coherence=np.fromiter((s['coherence'] for s in data), dtype=np.float64, count=n),
+            phase=encode_phases([s['phase'] for s in data]),
+            personality=[s.get('personality', {}) for s in data],
+            response=[s.get('response', "") for s in data]
+        )
+        
+    def __len__(self) -> int:
+        return len(self.temperature)
+        
+    def __iter__(self) -> Iterator[MCState]:
+        """Yield the batch as MCState objects for list-based callers"""
+        for i in range(len(self)):
+            yield MCState(
+                temperature=float(self.temperature[i]),
+                energy=float(self.energy[i]),
+                entropy=float(self.entropy[i]),
+                enthalpy=float(self.enthalpy[i]),
+                coherence=float(self.coherence[i]),
+                personality=self.personality[i],
+                phase=decode_phase(self.phase[i]),
+                response=self.response[i]
+            )
@@ -5,7 +5,7 @@ import os
 from dotenv import load_dotenv
 import asyncio
 from flows.experiments.run_phase_experiment import PersonalityPhaseExperiment
-import json
+from flows.core.data_storage import load_generation_file
 
 async def run_dream_evolution_experiment():
     # Load environment variables from .env file
@@ -34,10 +34,7 @@ async def run_dream_evolution_experiment():
     generation_id = await experiment.run_experiment(parameters)
     
     # Load and return results
-    results_file = experiment.generations_dir / f"{generation_id}.json"
-    with open(results_file) as f:
-        results = json.load(f)
-    return results
+    return load_generation_file(experiment.generations_dir / f"{generation_id}.jsonl.gz")
 
 async def main():
     print("Initializing PersonalityThermodynamics...")
@@ -1,14 +1,37 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')  # Figures are written to disk, never shown
 import matplotlib.pyplot as plt
 from ..core.monte_carlo import MonteCarloAnalyzer
 from ..core.thermodynamics import PersonalityThermodynamics
+from ..core.types import encode_phases
 from pathlib import Path
 import json
+import secrets
 from datetime import datetime
 from ..personality_generator import PersonalityGenerator
 from flows.core.personality_sampling import PersonalityMatrix
 
+# Bias weights used to encourage diversity between generated personalities
+PERSONALITY_ARCHETYPES = (
+    {"analytical": 0.9, "creative": 0.4},  # Analytical bias
+    {"creative": 0.9, "social": 0.4},      # Creative bias
+    {"social": 0.9, "practical": 0.4},     # Social bias
+    {"practical": 0.9, "analytical": 0.4}, # Practical bias
+    {"analytical": 0.6, "creative": 0.6}   # Balanced
+)
+
+class _NumpyEncoder(json.JSONEncoder):
+    """JSON encoder that converts numpy arrays and scalars in a single pass"""
+    
+    def default(self, o):
+        if isinstance(o, np.ndarray):
+            return o.tolist()
+        if isinstance(o, np.floating):
+            return float(o)
+        return super().default(o)
+
 class PersonalityPhaseExperiment:
     def __init__(self):
         self.thermodynamics = PersonalityThermodynamics()
@@ -17,6 +40,9 @@ class PersonalityPhaseExperiment:
         self.results_dir = Path("results")
         self.results_dir.mkdir(exist_ok=True)
         
+        # Personality pools keyed on (n_personalities, temperature)
+        self._personality_pools: Dict[Tuple[int, float], Tuple[PersonalityMatrix, ...]] = {}
+        
     def run_phase_separation_experiment(self,
                                       personalities: List[Dict],
                                       prompts: List[str],
@@ -94,7 +120,7 @@ class PersonalityPhaseExperiment:
         plt.ylabel('Phase Probability')
         plt.title('Personality Phase Separation')
         plt.legend()
-        plt.show()
+        self._save_figure('phase_probabilities')
         
     def _plot_free_energy(self, phase_results: List):
         """Plot free energy landscape"""
@@ -108,7 +134,7 @@ class PersonalityPhaseExperiment:
         plt.ylabel('Free Energy')
         plt.title('Free Energy Landscape')
         plt.legend()
-        plt.show()
+        self._save_figure('free_energy')
         
     def _plot_phase_transitions(self, phase_results: List):
         """Plot phase transitions"""
@@ -116,17 +142,22 @@ class PersonalityPhaseExperiment:
         
         for i, personality_results in enumerate(phase_results):
             states = [s for r in personality_results for s in r['states']]
-            phases = [s.phase for s in states]
+            phases = encode_phases([s.phase for s in states])
             
-            # Count phase transitions
-            transitions = np.diff([hash(p) for p in phases]) != 0
+            # Count phase transitions by comparing neighbouring phase codes
+            transitions = phases[1:] != phases[:-1]
             plt.plot(transitions, label=f'Personality {i+1}')
             
         plt.xlabel('Step')
         plt.ylabel('Phase Transition')
         plt.title('Phase Transitions')
         plt.legend()
-        plt.show()
+        self._save_figure('phase_transitions')
+        
+    def _save_figure(self, name: str):
+        """Save the current figure to the results directory and release it"""
+        plt.gcf().savefig(self.results_dir / f'{name}.png', dpi=100)
+        plt.close()
         
     def save_results(self, results: Dict, filename: Optional[str] = None) -> Path:
         """Save experiment results to JSON file
@@ -139,17 +170,27 @@ class PersonalityPhaseExperiment:
             Path to saved results file
         """
         if filename is None:
-            # Generate filename with timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"phase_experiment_{timestamp}.json"
+            # Timestamp plus a random suffix so runs started in the same second don't collide
+            filename = f"phase_experiment_{datetime.now():%Y%m%d_%H%M%S}_{secrets.token_hex(4)}.json"
             
         output_path = self.results_dir / filename
         
-        # Convert numpy arrays to lists for JSON serialization
-        serializable_results = self._prepare_for_serialization(results)
-        
+        # Numpy arrays are converted by the encoder while writing
         with open(output_path, "w") as f:
-            json.dump(serializable_results, f, indent=2)
+            f.write(json.dumps(results, indent=2, cls=_NumpyEncoder))
+            
+        # Write state columns alongside so analysis can skip the JSON decode
+        states = self._collect_states(results)
+        if states:
+            np.savez(
+                output_path.with_suffix(".npz"),
+                temperature=np.fromiter((s.temperature for s in states), dtype=np.float64, count=len(states)),
+                energy=np.fromiter((s.energy for s in states), dtype=np.float64, count=len(states)),
+                entropy=np.fromiter((s.entropy for s in states), dtype=np.float64, count=len(states)),
+                enthalpy=np.fromiter((s.enthalpy for s in states), dtype=np.float64, count=len(states)),
+                coherence=np.fromiter((s.coherence for s in states), dtype=np.float64, count=len(states)),
+                phase=np.array([s.phase for s in states])
+            )
             
         print(f"Results saved to {output_path}")
         return output_path
@@ -172,6 +213,21 @@ class PersonalityPhaseExperiment:
             
         return results
     
+    def load_state_columns(self, filename: str):
+        """Load the state columns saved next to a results file
+        
+        Args:
+            filename: Name of results file whose columns should be loaded
+            
+        Returns:
+            Mapping of column name to array; each column is read and decompressed on access
+        """
+        input_path = (self.results_dir / filename).with_suffix(".npz")
+        if not input_path.exists():
+            raise FileNotFoundError(f"No state columns found at {input_path}")
+            
+        return np.load(input_path)
+    
     def list_results(self) -> List[str]:
         """List all saved result files
         
@@ -180,45 +236,28 @@ class PersonalityPhaseExperiment:
         """
         return [f.name for f in self.results_dir.glob("phase_experiment_*.json")]
     
-    def _prepare_for_serialization(self, results: Dict) -> Dict:
-        """Prepare results dictionary for JSON serialization
-        
-        Converts numpy arrays and other non-serializable types to basic Python types
-        """
-        processed = {}
-        for key, value in results.items():
-            if isinstance(value, np.ndarray):
-                processed[key] = value.tolist()
-            elif isinstance(value, list):
-                processed[key] = [
-                    item.tolist() if isinstance(item, np.ndarray) else item 
-                    for item in value
-                ]
-            elif isinstance(value, dict):
-                processed[key] = self._prepare_for_serialization(value)
-            else:
-                processed[key] = value
-        return processed 
-    
-    def generate_diverse_personalities(self, n_personalities: int, temperature: float = 0.7) -> List[PersonalityMatrix]:
-        """Generate diverse personalities using the generator"""
-        personalities = []
-        
-        # Use different bias weights to encourage diversity
-        biases = [
-            {"analytical": 0.9, "creative": 0.4},  # Analytical bias
-            {"creative": 0.9, "social": 0.4},      # Creative bias
-            {"social": 0.9, "practical": 0.4},     # Social bias
-            {"practical": 0.9, "analytical": 0.4}, # Practical bias
-            {"analytical": 0.6, "creative": 0.6}   # Balanced
+    def _collect_states(self, results: Dict) -> List:
+        """Flatten the MCStates stored under each personality/prompt result"""
+        return [
+            state
+            for personality_results in results.get('phase_probabilities', [])
+            for prompt_result in personality_results
+            for state in prompt_result.get('states', [])
         ]
+    
+    def generate_diverse_personalities(self, n_personalities: int, temperature: float = 0.7) -> Tuple[PersonalityMatrix, ...]:
+        """Generate diverse personalities using the generator
         
-        for i in range(n_personalities):
-            bias = biases[i % len(biases)]
-            personality = self.personality_generator.generate(
-                temperature=temperature,
-                bias=bias
+        Results are cached per (n_personalities, temperature) so repeated calls,
+        e.g. one per replica, share the same personality pool.
+        """
+        key = (n_personalities, temperature)
+        if key not in self._personality_pools:
+            self._personality_pools[key] = tuple(
+                self.personality_generator.generate(
+                    temperature=temperature,
+                    bias=PERSONALITY_ARCHETYPES[i % len(PERSONALITY_ARCHETYPES)]
+                )
+                for i in range(n_personalities)
             )
-            personalities.append(personality)
-            
-        return personalities
\ No newline at end of file
+        return self._personality_pools[key]
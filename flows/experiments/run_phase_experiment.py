@@ -1,9 +1,12 @@
 from dotenv import load_dotenv
 import asyncio
+import dataclasses
 import argparse
+import itertools
 import numpy as np
 from typing import Dict, List, Any,  Optional
 import json
+import orjson
 from datetime import datetime
 from pathlib import Path
 from flows.core.monte_carlo import MonteCarloAnalyzer
@@ -15,14 +18,32 @@ import os
 from flows.core.types import MCState
 from ..personality_generator import PersonalityGenerator
 import aiofiles
+import hashlib
+import secrets
 import time
+import zlib
 from flows.core.personality_dreams import PersonalityDreams
 
 # Add this at the start of your script
 load_dotenv()
 
+# Fixed-width layout of the numeric state fields written next to each generation
+STATE_RECORD_DTYPE = np.dtype([
+    ('temperature', 'f8'),
+    ('energy', 'f8'),
+    ('entropy', 'f8'),
+    ('enthalpy', 'f8'),
+    ('coherence', 'f8'),
+    ('phase', 'U16')
+])
+
+# MCState fields written inline; personalities are interned into a table
+STATE_RECORD_FIELDS = tuple(
+    field.name for field in dataclasses.fields(MCState) if field.name != 'personality'
+)
+
 class PersonalityPhaseExperiment:
-    def __init__(self, llm_client: Optional[LLMClient] = None):
+    def __init__(self, llm_client: Optional[LLMClient] = None, seed: Optional[int] = None):
         self.thermodynamics = PersonalityThermodynamics()
         self.llm_client = llm_client or LLMClient()
         self.monte_carlo = MonteCarloAnalyzer(self.thermodynamics, self.llm_client)
@@ -33,7 +54,14 @@ class PersonalityPhaseExperiment:
         self.generations_dir.mkdir(parents=True, exist_ok=True)
         self.metadata_dir.mkdir(parents=True, exist_ok=True)
         
-        self.personality_generator = PersonalityGenerator()
+        # Per-experiment generators so concurrent samples don't share global RNG state.
+        # Temperatures and personalities get independent child streams of the seed
+        self.seed = seed
+        temperature_seq, personality_seq = np.random.SeedSequence(seed).spawn(2)
+        self.rng = np.random.default_rng(temperature_seq)
+        self.personality_generator = PersonalityGenerator(
+            seed=int(personality_seq.generate_state(1, np.uint64)[0])
+        )
 
     async def run_experiment(self, parameters: Dict) -> str:
         """Run phase transition experiment with improved error handling"""
@@ -42,79 +70,121 @@ class PersonalityPhaseExperiment:
         # Generate random temperatures within the range
         temp_range = parameters.get('temp_range', [0.1, 2.0])
         n_steps = parameters.get('n_steps', 10)
-        temperatures = np.random.uniform(low=temp_range[0], high=temp_range[1], size=n_steps)
+        temperatures = self.rng.uniform(low=temp_range[0], high=temp_range[1], size=n_steps)
         
         print(f"Running experiment across {n_steps} temperature points")
         
-        all_states = []
-        for i, temp in enumerate(temperatures):
-            print(f"Processing temperature point {i+1}/{n_steps}: T={temp:.2f}")
-            states = await self._run_temperature_sample(
-                temperature=temp,
-                prompts=parameters.get('prompts', ["Tell me about yourself"]),
-                n_steps=parameters.get('n_steps', 10),
-                batch_size=parameters.get('batch_size', 5)
-            )
+        prompts = parameters.get('prompts', ["Tell me about yourself"])
+        batch_size = parameters.get('batch_size', 5)
+        semaphore = asyncio.Semaphore(parameters.get('max_concurrency', 32))
+        
+        async def run_bounded(i: int, temp: float):
+            # Samples are independent, so only the semaphore limits how many are in flight
+            async with semaphore:
+                print(f"Processing temperature point {i+1}/{n_steps}: T={temp:.2f}")
+                return temp, await self._run_temperature_sample(
+                    temperature=temp,
+                    prompts=prompts,
+                    n_steps=n_steps,
+                    batch_size=batch_size
+                )
+        
+        # Random suffix keeps concurrent experiments from overwriting each other
+        generation_id = f"phase_exp_{int(datetime.now().timestamp())}_{secrets.token_hex(4)}"
+        output_file = self.generations_dir / f"{generation_id}.jsonl.gz"
+        print(f"Streaming states with ID: {generation_id}")
+        
+        # Only the numeric fields are kept in memory; full states go straight to disk.
+        # A single gzip stream (level 3) keeps compression cheap next to the LLM calls
+        records = []
+        personality_ids: Dict[bytes, int] = {}  # Personality digest -> id
+        compressor = zlib.compressobj(3, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        async with aiofiles.open(output_file, 'wb') as f:
+            await f.write(compressor.compress(orjson.dumps(
+                {"metadata": self._build_metadata(generation_id, parameters)},
+                option=orjson.OPT_SERIALIZE_NUMPY
+            ) + b"\n"))
             
-            if states:
+            for sample in asyncio.as_completed([
+                run_bounded(i, temp) for i, temp in enumerate(temperatures)
+            ]):
+                temp, states = await sample
+                if not states:
+                    print(f"Warning: No states generated for temperature {temp:.2f}")
+                    continue
+                    
                 print(f"Generated {len(states)} states for temperature {temp:.2f}")
-                all_states.extend(states)
-            else:
-                print(f"Warning: No states generated for temperature {temp:.2f}")
+                await f.write(compressor.compress(b"".join(
+                    self._serialize_state(state, personality_ids) for state in states
+                )))
+                records.extend(
+                    (s.temperature, s.energy, s.entropy, s.enthalpy, s.coherence, s.phase)
+                    for s in states
+                )
+                
+            await f.write(compressor.flush())
             
-        if not all_states:
+        if not records:
+            output_file.unlink()
             raise Exception("No valid states generated across all temperatures")
             
-        # Save results
-        generation_id = f"phase_exp_{int(datetime.now().timestamp())}"
-        print(f"Saving {len(all_states)} total states with ID: {generation_id}")
-        await self._save_results(all_states, generation_id, parameters)
+        print(f"Saved {len(records)} total states with ID: {generation_id}")
+        self._save_state_columns(records, self.generations_dir / f"{generation_id}.npz")
         return generation_id
 
-    async def _save_results(self, states: List[Dict], generation_id: str, parameters: Dict):
-        """Save experiment results with metadata"""
-        # Convert MCState objects to dictionaries
-        serialized_states = []
-        for state in states:
-            # Check if personality is already a dict or needs conversion
-            personality_dict = state.personality if isinstance(state.personality, dict) else state.personality.to_dict()
-            
-            state_dict = {
-                "temperature": state.temperature,
-                "energy": state.energy,
-                "entropy": state.entropy,
-                "enthalpy": state.enthalpy,
-                "coherence": state.coherence,
-                "personality": personality_dict,
-                "phase": state.phase,
-                "response": state.response
-            }
-            serialized_states.append(state_dict)
-
-        output = {
-            "metadata": {
-                "experiment_id": generation_id,
-                "timestamp": datetime.now().isoformat(),
-                "parameters": parameters,
-                "model": {
-                    "name": "gpt-4o-mini",
-                    "provider": "OpenAI",
-                    "parameters": {
-                        "max_tokens": 100,
-                        "top_p": 1,
-                        "frequency_penalty": 0,
-                        "presence_penalty": 0,
-                        "response_format": {"type": "text"},
-                        "seed": None
-                    }
+    def _build_metadata(self, generation_id: str, parameters: Dict) -> Dict:
+        """Build the metadata record written at the top of a generation file"""
+        return {
+            "experiment_id": generation_id,
+            "timestamp": datetime.now().isoformat(),
+            "parameters": parameters,
+            "seed": self.seed,
+            "model": {
+                "name": "gpt-4o-mini",
+                "provider": "OpenAI",
+                "parameters": {
+                    "max_tokens": 100,
+                    "top_p": 1,
+                    "frequency_penalty": 0,
+                    "presence_penalty": 0,
+                    "response_format": {"type": "text"},
+                    "seed": None
                 }
-            },
-            "states": serialized_states
+            }
         }
+
+    def _serialize_state(self, state: MCState, personality_ids: Dict[bytes, int]) -> bytes:
+        """Encode an MCState as NDJSON lines, interning its personality
+        
+        The first time a personality is seen, a {"personality": {id: ...}} line
+        is emitted ahead of the state that references it.
         
-        output_file = self.generations_dir / f"{generation_id}.json"
-        async with aiofiles.open(output_file, 'w') as f:
-            await f.write(json.dumps(output, indent=2))
+        Args:
+            state: State to encode
+            personality_ids: Personality digest to id table, updated in place
+        """
+        # Check if personality is already a dict or needs conversion
+        personality = state.personality if isinstance(state.personality, dict) else state.personality.to_dict()
+        personality_json = orjson.dumps(personality, option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        digest = hashlib.blake2b(personality_json, digest_size=16).digest()
+        
+        lines = b""
+        personality_id = personality_ids.get(digest)
+        if personality_id is None:
+            personality_id = personality_ids[digest] = len(personality_ids)
+            lines = b'{"personality":{"%d":%b}}\n' % (personality_id, personality_json)
+            
+        record = {name: getattr(state, name) for name in STATE_RECORD_FIELDS}
+        record["personality_id"] = personality_id
+        return lines + orjson.dumps(record, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n"
+
+    def _save_state_columns(self, records: List[tuple], output_file: Path):
+        """Write numeric columns to a compressed sidecar for vectorized analysis"""
+        columns = np.fromiter(records, dtype=STATE_RECORD_DTYPE, count=len(records))
+        np.savez_compressed(
+            output_file,
+            **{name: columns[name] for name in columns.dtype.names}
+        )
 
     async def _run_temperature_sample(self,
                                     temperature: float,
@@ -123,28 +193,25 @@ class PersonalityPhaseExperiment:
                                     batch_size: int) -> List[MCState]:
         """Run Monte Carlo sampling at a specific temperature"""
         try:
-            # Generate multiple personalities for the batch
-            states = []
-            for _ in range(batch_size):
-                # Generate a new personality for each sample
-                personality = self.personality_generator.generate()
-                
-                # Run Monte Carlo simulation for each personality
-                batch_states = await self.monte_carlo.run_simulation_async(
+            # Generate a new personality for each sample in the batch
+            personalities = [self.personality_generator.generate() for _ in range(batch_size)]
+            
+            # Every personality/prompt pair is an independent LLM call, so run them together
+            batch_states = await asyncio.gather(*[
+                self.monte_carlo.run_simulation_async(
                     initial_personality=personality,
-                    prompts=prompts,
+                    prompts=[prompt],
                     n_steps=1,  # Changed to 1 since we're handling batching here
                     batch_size=1,
                     temperature=temperature
                 )
-                
-                valid_states = [
-                    state for state in batch_states 
-                    if state.response and not state.response.startswith("Error:")
-                ]
-                
-                if valid_states:
-                    states.extend(valid_states)
+                for personality, prompt in itertools.product(personalities, prompts)
+            ])
+            
+            states = [
+                state for state in itertools.chain.from_iterable(batch_states)
+                if state.response and not state.response.startswith("Error:")
+            ]
             
             if not states:
                 print(f"Warning: No valid states generated for temperature {temperature}")
@@ -200,6 +267,9 @@ def load_parameters(config_path: str = "configs/default_experiment.json") -> Dic
             "n_steps": config["experiment"]["n_steps"],
             "batch_size": config["experiment"]["batch_size"],
             "prompts": config["experiment"]["prompts"],
+            "max_concurrency": config["experiment"].get("max_concurrency", 32),
+            "seed": config["experiment"].get("seed"),
+            "qpm": config["experiment"].get("qpm"),
             "model": config["model"]
         }
         
@@ -225,14 +295,21 @@ def load_parameters(config_path: str = "configs/default_experiment.json") -> Dic
         }
 
 async def main():
+    experiment = None
     try:
-        experiment = PersonalityPhaseExperiment()
         parameters = load_parameters()
+        experiment = PersonalityPhaseExperiment(
+            llm_client=LLMClient(qpm=parameters.get('qpm')),
+            seed=parameters.get('seed')
+        )
         generation_id = await experiment.run_experiment(parameters)
         print(f"Experiment completed. Generation ID: {generation_id}")
     except Exception as e:
         print(f"Error running experiment: {str(e)}")
         raise
+    finally:
+        if experiment is not None:
+            await experiment.llm_client.aclose()
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
@@ -21,7 +21,8 @@ async def run_basic_interaction():
     try:
         # Initialize components
         print("\nInitializing components...")
-        llm = LLMClient(api_key=api_key)
+        # Repeats reuse identical prompts, so cache responses across runs
+        llm = LLMClient(api_key=api_key, cache_path="llm_cache.json")
         thermodynamics = PersonalityThermodynamics()
         mc_analyzer = MonteCarloAnalyzer(thermodynamics, llm_client=llm)
         print("Components initialized successfully")
@@ -54,18 +55,20 @@ async def run_basic_interaction():
         n_temperatures = 10  # Number of temperature points
         repeats = 10  # Number of repeats per temperature
         
-        all_states = []
-        for i in range(n_temperatures):
-            print(f"\nRunning temperature point {i+1}/{n_temperatures}")
-            for j in range(repeats):
-                states = await mc_analyzer.run_simulation_async(
+        # Submit every repeat at once; the semaphore keeps us within provider rate limits
+        semaphore = asyncio.Semaphore(20)
+        
+        async def run_repeat():
+            async with semaphore:
+                return await mc_analyzer.run_simulation_async(
                     initial_personality=personality,
                     prompts=[prompt],
                     n_steps=10,
                     batch_size=5
                 )
-                all_states.extend(states)
-                print(f"  Completed repeat {j+1}/{repeats}")
+        
+        results = await asyncio.gather(*[run_repeat() for _ in range(n_temperatures * repeats)])
+        all_states = [state for states in results for state in states]
         
         print(f"\nSimulation completed with {len(all_states)} total states")
         
@@ -1,94 +1,130 @@
 from typing import Dict, List, Optional, TypedDict
-import random
 import numpy as np
+from types import MappingProxyType
 from .core.personality_sampling import PersonalityMatrix
 from .core.thermodynamics import PersonalityThermodynamics
 
+# Core trait bags
+TRAITS = MappingProxyType({
+    "analytical": (
+        "analyze", "systematic", "logical", "precise", "methodical",
+        "rational", "structured", "investigative", "detailed", "objective"
+    ),
+    "creative": (
+        "innovative", "imaginative", "artistic", "expressive", "original",
+        "inventive", "experimental", "intuitive", "visionary", "exploratory"
+    ),
+    "social": (
+        "collaborative", "empathetic", "communicative", "supportive", "engaging",
+        "interactive", "connecting", "inclusive", "responsive", "understanding"
+    ),
+    "practical": (
+        "efficient", "pragmatic", "reliable", "focused", "consistent",
+        "organized", "purposeful", "steady", "grounded", "results-oriented"
+    )
+})
+
+# Environmental perspectives
+WORLD_VIEWS = MappingProxyType({
+    "analytical": (
+        "system of interconnected principles",
+        "framework of logical patterns",
+        "structured network of knowledge",
+        "complex analytical landscape"
+    ),
+    "creative": (
+        "canvas of endless possibilities",
+        "dynamic space of innovation",
+        "realm of creative exploration",
+        "evolving artistic dimension"
+    ),
+    "social": (
+        "interconnected community",
+        "collaborative ecosystem",
+        "network of shared experiences",
+        "harmonious social fabric"
+    ),
+    "practical": (
+        "organized framework",
+        "efficient mechanism",
+        "practical foundation",
+        "functional environment"
+    )
+})
+
+# Action verbs for goals
+GOAL_VERBS = (
+    "explore", "develop", "optimize", "create", "analyze",
+    "build", "discover", "implement", "investigate", "synthesize"
+)
+
+# Goal domains
+GOAL_DOMAINS = (
+    "knowledge", "solutions", "systems", "relationships", "innovations",
+    "processes", "understanding", "frameworks", "connections", "patterns"
+)
+
 class PersonalityGenerator:
-    def __init__(self):
-        # Core trait bags
-        self.traits = {
-            "analytical": [
-                "analyze", "systematic", "logical", "precise", "methodical",
-                "rational", "structured", "investigative", "detailed", "objective"
-            ],
-            "creative": [
-                "innovative", "imaginative", "artistic", "expressive", "original",
-                "inventive", "experimental", "intuitive", "visionary", "exploratory"
-            ],
-            "social": [
-                "collaborative", "empathetic", "communicative", "supportive", "engaging",
-                "interactive", "connecting", "inclusive", "responsive", "understanding"
-            ],
-            "practical": [
-                "efficient", "pragmatic", "reliable", "focused", "consistent",
-                "organized", "purposeful", "steady", "grounded", "results-oriented"
-            ]
-        }
+    def __init__(self, seed: Optional[int] = None):
+        """Initialize the generator
         
-        # Environmental perspectives
-        self.world_views = {
-            "analytical": [
-                "system of interconnected principles",
-                "framework of logical patterns",
-                "structured network of knowledge",
-                "complex analytical landscape"
-            ],
-            "creative": [
-                "canvas of endless possibilities",
-                "dynamic space of innovation",
-                "realm of creative exploration",
-                "evolving artistic dimension"
-            ],
-            "social": [
-                "interconnected community",
-                "collaborative ecosystem",
-                "network of shared experiences",
-                "harmonious social fabric"
-            ],
-            "practical": [
-                "organized framework",
-                "efficient mechanism",
-                "practical foundation",
-                "functional environment"
-            ]
-        }
+        Args:
+            seed: Optional seed for the generator's random stream
+        """
+        # Shared, immutable word tables
+        self.traits = TRAITS
+        self.world_views = WORLD_VIEWS
+        self.goal_verbs = GOAL_VERBS
+        self.goal_domains = GOAL_DOMAINS
         
-        # Action verbs for goals
-        self.goal_verbs = [
-            "explore", "develop", "optimize", "create", "analyze",
-            "build", "discover", "implement", "investigate", "synthesize"
-        ]
+        # Index-addressable views of the word lists for vectorized sampling
+        self._categories = tuple(self.traits)
+        self._trait_lists = tuple(self.traits[c] for c in self._categories)
+        self._view_lists = tuple(self.world_views[c] for c in self._categories)
+        self._trait_words = np.array([self.traits[c] for c in self._categories])
+        self._view_words = np.array([self.world_views[c] for c in self._categories])
+        self._verb_words = np.array(self.goal_verbs)
+        self._domain_words = np.array(self.goal_domains)
+        self.rng = np.random.default_rng(seed)
         
-        # Goal domains
-        self.goal_domains = [
-            "knowledge", "solutions", "systems", "relationships", "innovations",
-            "processes", "understanding", "frameworks", "connections", "patterns"
-        ]
+        # Upper bounds for generate()'s single draw: primary category, secondary
+        # offset, 4 goal category picks, 4 verbs, 4 goal traits, 4 domains,
+        # 2 self-image traits, 2 views
+        self._n_categories = n_categories = len(self._categories)
+        n_traits, n_views = self._trait_words.shape[1], self._view_words.shape[1]
+        self._generate_bounds = np.array(
+            [n_categories, n_categories - 1] + [2] * 4
+            + [len(self.goal_verbs)] * 4 + [n_traits] * 4 + [len(self.goal_domains)] * 4
+            + [n_traits] * 2 + [n_views] * 2
+        )
+        self._index_buffer: List[List[int]] = []
 
     def generate(self) -> PersonalityMatrix:
         """Generate a random personality from trait components"""
-        # Randomly select primary and secondary trait categories
-        trait_categories = random.sample(list(self.traits.keys()), k=2)
-        primary_trait = trait_categories[0]
-        secondary_trait = trait_categories[1]
+        # All indices come from one draw; see _generate_bounds for the layout
+        idx = self._next_indices()
+        
+        # Randomly select primary and secondary trait categories; the offset
+        # keeps the secondary distinct from the primary
+        primary = idx[0]
+        secondary = (primary + 1 + idx[1]) % self._n_categories
+        primary_traits = self._trait_lists[primary]
+        secondary_traits = self._trait_lists[secondary]
         
         # Generate goals combining verbs, traits, and domains
-        goals = []
-        for _ in range(4):
-            verb = random.choice(self.goal_verbs)
-            trait = random.choice(self.traits[random.choice(trait_categories)])
-            domain = random.choice(self.goal_domains)
-            goals.append(f"{verb} {trait} {domain}")
+        goals = [
+            f"{self.goal_verbs[verb]} {(secondary_traits if pick else primary_traits)[trait]} {self.goal_domains[domain]}"
+            for pick, verb, trait, domain in zip(idx[2:6], idx[6:10], idx[10:14], idx[14:18])
+        ]
         
         # Generate self image combining traits
-        primary_trait_word = random.choice(self.traits[primary_trait])
-        secondary_trait_word = random.choice(self.traits[secondary_trait])
+        primary_trait_word = primary_traits[idx[18]]
+        secondary_trait_word = secondary_traits[idx[19]]
         self_image = f"{primary_trait_word} {secondary_trait_word} system"
         
         # Generate worldview combining perspectives
-        primary_view = random.choice(self.world_views[primary_trait])
-        secondary_view = random.choice(self.world_views[secondary_trait])
+        primary_view = self._view_lists[primary][idx[20]]
+        secondary_view = self._view_lists[secondary][idx[21]]
         world_view = f"A {primary_view} with {secondary_view}"
         
         return PersonalityMatrix(
@@ -97,6 +133,55 @@ class PersonalityGenerator:
             I_W=world_view
         )
 
+    def _next_indices(self) -> List[int]:
+        """Return one row of generate() indices, refilling the buffer in bulk"""
+        if not self._index_buffer:
+            self._index_buffer = self.rng.integers(
+                0, self._generate_bounds, size=(256, len(self._generate_bounds))
+            ).tolist()
+        return self._index_buffer.pop()
+
+    def generate_batch(self, n_personalities: int) -> List[PersonalityMatrix]:
+        """Generate many personalities with one vectorized draw per component
+        
+        Samples from the same distribution as generate(), but every random index
+        for the whole batch is drawn up front so only string assembly is per-item.
+        
+        Args:
+            n_personalities: Number of personalities to generate
+            
+        Returns:
+            List of generated personalities
+        """
+        n_categories, n_traits = self._trait_words.shape
+        n_views = self._view_words.shape[1]
+        rows = np.arange(n_personalities)[:, None]
+        
+        # Primary and secondary categories without replacement via random keys
+        categories = np.argsort(self.rng.random((n_personalities, n_categories)), axis=1)[:, :2]
+        
+        # Goals: each picks one of the two categories plus a verb, trait and domain
+        goal_categories = categories[rows, self.rng.integers(0, 2, size=(n_personalities, 4))]
+        goal_traits = self._trait_words[goal_categories, self.rng.integers(0, n_traits, size=(n_personalities, 4))]
+        goal_verbs = self._verb_words[self.rng.integers(0, len(self._verb_words), size=(n_personalities, 4))]
+        goal_domains = self._domain_words[self.rng.integers(0, len(self._domain_words), size=(n_personalities, 4))]
+        
+        # Self image and worldview use the primary and secondary categories
+        self_words = self._trait_words[categories, self.rng.integers(0, n_traits, size=(n_personalities, 2))]
+        views = self._view_words[categories, self.rng.integers(0, n_views, size=(n_personalities, 2))]
+        
+        # Convert to Python strings once rather than formatting numpy scalars
+        return [
+            PersonalityMatrix(
+                I_G=[f"{v} {t} {d}" for v, t, d in zip(verbs, traits, domains)],
+                I_S=f"{primary_word} {secondary_word} system",
+                I_W=f"A {primary_view} with {secondary_view}"
+            )
+            for verbs, traits, domains, (primary_word, secondary_word), (primary_view, secondary_view)
+            in zip(goal_verbs.tolist(), goal_traits.tolist(), goal_domains.tolist(),
+                   self_words.tolist(), views.tolist())
+        ]
+
     def generate_diverse_personalities(self, n_personalities: int) -> List[PersonalityMatrix]:
         """Generate multiple diverse personalities"""
-        return [self.generate() for _ in range(n_personalities)]
\ No newline at end of file
+        return self.generate_batch(n_personalities)
\ No newline at end of file
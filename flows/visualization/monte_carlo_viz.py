@@ -1,9 +1,22 @@
 import matplotlib.pyplot as plt
 import numpy as np
+import asyncio
+import hashlib
+import json
+from operator import attrgetter
 from typing import List, Dict
 from flows.core.monte_carlo import MCState
+from flows.core.types import decode_phase, encode_phases
 from flows.core.personality_embeddings import PersonalityEmbeddingLibrary
 
+# Numeric MCState fields extracted together for plotting
+STATE_ARRAY_FIELDS = ('temperature', 'energy', 'entropy', 'enthalpy', 'coherence')
+STATE_ARRAY_DTYPE = np.dtype([(field, np.float64) for field in STATE_ARRAY_FIELDS])
+_state_values = attrgetter(*STATE_ARRAY_FIELDS)
+
+# Largest similarity matrix side drawn before block-averaging
+SIMILARITY_PLOT_SIZE = 512
+
 class MonteCarloVisualizer:
     def __init__(self):
         try:
@@ -11,73 +24,84 @@ class MonteCarloVisualizer:
         except:
             plt.style.use('default')
         self.embedding_library = PersonalityEmbeddingLibrary()
-            
-    def plot_thermodynamic_landscape(self, states: List[MCState]):
-        """Plot comprehensive thermodynamic landscape"""
-        temperatures = [s.temperature for s in states]
         
+        # Personality vectors keyed on a hash of the personality content
+        self._embed_cache: Dict[str, np.ndarray] = {}
+            
+    def _states_to_arrays(self, states: List[MCState]) -> Dict[str, np.ndarray]:
+        """Extract the numeric state fields into float arrays in a single pass"""
+        rows = np.fromiter(map(_state_values, states), dtype=STATE_ARRAY_DTYPE, count=len(states))
+        return {field: rows[field] for field in STATE_ARRAY_FIELDS}
+            
+    def _build_thermo_axes(self):
+        """Create the thermodynamic landscape figure and its empty scatters"""
         # Create subplots for each thermodynamic property
-        fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 12))
-        fig.suptitle('Thermodynamic Landscape Analysis')
-        
-        # Energy plot
-        ax1.scatter(temperatures, [s.energy for s in states], alpha=0.6, c=temperatures, cmap='viridis')
-        ax1.set_xlabel('Temperature')
-        ax1.set_ylabel('Energy')
-        ax1.set_title('Energy vs Temperature')
-        
-        # Entropy plot
-        ax2.scatter(temperatures, [s.entropy for s in states], alpha=0.6, c=temperatures, cmap='viridis')
-        ax2.set_xlabel('Temperature')
-        ax2.set_ylabel('Entropy')
-        ax2.set_title('Entropy vs Temperature')
-        
-        # Enthalpy plot
-        ax3.scatter(temperatures, [s.enthalpy for s in states], alpha=0.6, c=temperatures, cmap='viridis')
-        ax3.set_xlabel('Temperature')
-        ax3.set_ylabel('Enthalpy')
-        ax3.set_title('Enthalpy vs Temperature')
+        self._fig_thermo, axes = plt.subplots(2, 2, figsize=(15, 12))
+        self._fig_thermo.suptitle('Thermodynamic Landscape Analysis')
+        
+        self._scatters = {}
+        for ax, field in zip(axes.flat, STATE_ARRAY_FIELDS[1:]):
+            label = field.capitalize()
+            self._scatters[field] = ax.scatter([], [], alpha=0.6, c=[], cmap='viridis')
+            ax.set_xlabel('Temperature')
+            ax.set_ylabel(label)
+            ax.set_title(f'{label} vs Temperature')
+            
+    def plot_thermodynamic_landscape(self, states: List[MCState]):
+        """Plot comprehensive thermodynamic landscape
         
-        # Coherence plot
-        ax4.scatter(temperatures, [s.coherence for s in states], alpha=0.6, c=temperatures, cmap='viridis')
-        ax4.set_xlabel('Temperature')
-        ax4.set_ylabel('Coherence')
-        ax4.set_title('Coherence vs Temperature')
+        The figure is built once and its scatters updated in place on later
+        calls, so repeated plotting during a run doesn't rebuild the axes.
+        """
+        arrays = self._states_to_arrays(states)
+        temperatures = arrays['temperature']
         
-        plt.tight_layout()
+        if not hasattr(self, '_fig_thermo') or not plt.fignum_exists(self._fig_thermo.number):
+            self._build_thermo_axes()
+            
+        # Energy, entropy, enthalpy and coherence against temperature
+        for field, scatter in self._scatters.items():
+            scatter.set_offsets(np.column_stack([temperatures, arrays[field]]))
+            scatter.set_array(temperatures)
+            scatter.autoscale()
+            scatter.axes.ignore_existing_data_limits = True
+            scatter.axes.update_datalim(scatter.get_offsets())
+            scatter.axes.autoscale_view()
+            
+        self._fig_thermo.tight_layout()
+        self._fig_thermo.canvas.draw_idle()
         
     def plot_phase_stability(self, states: List[MCState]):
         """Plot phase stability metrics"""
-        temperatures = [s.temperature for s in states]
-        phases = [s.phase for s in states]
-        unique_phases = list(set(phases))
+        temperatures = self._states_to_arrays(states)['temperature']
+        phases = encode_phases([s.phase for s in states])
+        unique_phases, phase_ids = np.unique(phases, return_inverse=True)
         
         # Create phase transition plot
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
         
-        # Phase probability distribution
-        phase_probs = {}
-        temp_bins = np.linspace(min(temperatures), max(temperatures), 20)
+        # Phase probability distribution: tally every state into its
+        # (phase, temperature bin) cell in one pass
+        temp_bins = np.linspace(temperatures.min(), temperatures.max(), 20)
+        n_bins = len(temp_bins) - 1
+        bin_idx = np.digitize(temperatures, temp_bins) - 1
+        in_range = bin_idx < n_bins  # Bins are half-open, so the maximum falls outside
         
-        for phase in unique_phases:
-            phase_probs[phase] = []
-            for i in range(len(temp_bins)-1):
-                mask = (np.array(temperatures) >= temp_bins[i]) & (np.array(temperatures) < temp_bins[i+1])
-                phase_count = sum(1 for p in np.array(phases)[mask] if p == phase)
-                prob = phase_count / sum(mask) if sum(mask) > 0 else 0
-                phase_probs[phase].append(prob)
+        counts = np.zeros((len(unique_phases), n_bins))
+        np.add.at(counts, (phase_ids[in_range], bin_idx[in_range]), 1)
+        totals = counts.sum(axis=0)
+        phase_probs = np.divide(counts, totals, out=np.zeros_like(counts), where=totals > 0)
         
         # Plot phase probabilities
-        for phase in unique_phases:
-            ax1.plot(temp_bins[:-1], phase_probs[phase], '-o', label=phase, alpha=0.7)
+        for phase, probs in zip(unique_phases, phase_probs):
+            ax1.plot(temp_bins[:-1], probs, '-o', label=decode_phase(phase), alpha=0.7)
         ax1.set_xlabel('Temperature')
         ax1.set_ylabel('Phase Probability')
         ax1.set_title('Phase Stability Analysis')
         ax1.legend()
         
         # Plot phase transitions
-        transitions = [1 if i > 0 and phases[i] != phases[i-1] else 0 
-                      for i in range(len(phases))]
+        transitions = np.concatenate(([0], phase_ids[1:] != phase_ids[:-1])).astype(np.int8)
         ax2.scatter(temperatures, transitions, alpha=0.6)
         ax2.set_xlabel('Temperature')
         ax2.set_ylabel('Phase Transition')
@@ -93,14 +117,24 @@ class MonteCarloVisualizer:
         # 3D Trajectory plot
         ax1 = fig.add_subplot(121, projection='3d')
         
-        # Extract personality vectors with semantic encoding
-        vectors = []
-        for state in states:
-            vec = await self._encode_personality_state(state.personality)
-            vectors.append(vec)
-        
-        vectors = np.array(vectors)
-        temperatures = np.array([s.temperature for s in states])
+        # Extract personality vectors with semantic encoding; each distinct
+        # personality is encoded once, concurrently, with bounded fan-out
+        keys = [self._personality_key(s.personality) for s in states]
+        unique = {key: s.personality for key, s in zip(keys, states)}
+        semaphore = asyncio.Semaphore(16)
+        
+        async def encode(personality: Dict) -> np.ndarray:
+            async with semaphore:
+                return await self._encode_personality_state(personality)
+                
+        # Encode the first state on its own so that, when no PCA model is cached,
+        # the library fits it on a fixed personality rather than whichever
+        # concurrent encode happens to finish first
+        if states:
+            await self._encode_personality_state(states[0].personality)
+        encoded = dict(zip(unique, await asyncio.gather(*map(encode, unique.values()))))
+        vectors = np.array([encoded[key] for key in keys])
+        temperatures = np.fromiter((s.temperature for s in states), dtype=np.float64, count=len(states))
         
         # Plot trajectory with lines connecting points
         scatter = ax1.scatter(vectors[:, 0], vectors[:, 1], vectors[:, 2],
@@ -122,14 +156,28 @@ class MonteCarloVisualizer:
         ax2 = fig.add_subplot(122)
         
         # Compute similarity matrix
-        n_samples = len(vectors)
-        similarity_matrix = np.zeros((n_samples, n_samples))
-        for i in range(n_samples):
-            for j in range(n_samples):
-                similarity_matrix[i, j] = self.embedding_library.compute_similarity(vectors[i], vectors[j])
+        similarity_matrix = self.embedding_library.compute_similarity_matrix(vectors)
+        
+        # Long traces have far more cells than pixels; block-average down to
+        # at most SIMILARITY_PLOT_SIZE per side before drawing
+        n_samples = len(similarity_matrix)
+        extent = None
+        if n_samples > SIMILARITY_PLOT_SIZE:
+            # Round the block size up and pad with NaN so every state is drawn;
+            # the padded cells are ignored when averaging
+            factor = -(-n_samples // SIMILARITY_PLOT_SIZE)
+            n_blocks = -(-n_samples // factor)
+            padded = np.full((n_blocks * factor, n_blocks * factor), np.nan)
+            padded[:n_samples, :n_samples] = similarity_matrix
+            similarity_matrix = np.nanmean(
+                padded.reshape(n_blocks, factor, n_blocks, factor), axis=(1, 3)
+            )
+            size = n_blocks * factor
+            extent = (-0.5, size - 0.5, size - 0.5, -0.5)  # Keep state-index axes
         
         # Plot similarity matrix
-        im = ax2.imshow(similarity_matrix, cmap='RdYlBu', aspect='auto')
+        im = ax2.imshow(similarity_matrix, cmap='RdYlBu', aspect='auto',
+                        interpolation='nearest', extent=extent)
         plt.colorbar(im, label='Cosine Similarity')
         ax2.set_title('Personality State Similarities')
         ax2.set_xlabel('State Index')
@@ -138,9 +186,20 @@ class MonteCarloVisualizer:
         fig.suptitle('Personality Evolution Analysis', y=1.05)
         plt.tight_layout()
         
+    def _personality_key(self, personality: Dict) -> str:
+        """Hash personality content for the embedding cache"""
+        return hashlib.blake2b(
+            json.dumps(personality, sort_keys=True, default=str).encode(),
+            digest_size=16
+        ).hexdigest()
+        
     async def _encode_personality_state(self, personality: Dict) -> np.ndarray:
         """Encode personality dictionary into a 3D vector using pre-computed embeddings"""
-        return await self.embedding_library.compute_personality_vector(personality)
+        # MC chains often revisit the same personality, so only encode each once
+        key = self._personality_key(personality)
+        if key not in self._embed_cache:
+            self._embed_cache[key] = await self.embedding_library.compute_personality_vector(personality)
+        return self._embed_cache[key]
         
     def show_all_plots(self):
         """Display all visualization plots"""
@@ -1,8 +1,41 @@
-from typing import List, Dict
+from typing import List, Dict, Optional, Union
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.stats import gaussian_kde
+from scipy.ndimage import gaussian_filter1d
 from flows.core.monte_carlo import MCState
+from flows.core.types import MCStateBatch, PHASE_CODES, decode_phase
+
+# Grid points used to evaluate the transition density
+KDE_GRID_SIZE = 512
+
+# Marker styles for the known phases in scatter plots
+PHASE_STYLES = {
+    'coherent': {'color': 'blue', 'marker': 'o', 'label': 'Coherent'},
+    'chaotic': {'color': 'red', 'marker': '^', 'label': 'Chaotic'},
+    'semi-coherent': {'color': 'green', 'marker': 's', 'label': 'Semi-coherent'}
+}
+
+States = Union[List[MCState], MCStateBatch]
+
+def _as_batch(states: States) -> MCStateBatch:
+    """Accept either a list of MCStates or an MCStateBatch"""
+    return states if isinstance(states, MCStateBatch) else MCStateBatch.from_states(states)
+
+def _binomial_error(p: np.ndarray, n: np.ndarray) -> np.ndarray:
+    """Standard error of binomial proportions, zero where there are no samples"""
+    return np.sqrt(np.where(n > 0, p * (1 - p) / np.maximum(n, 1), 0))
+
+def _uniform_hist(values: np.ndarray, nbins: int, lo: float, hi: float,
+                  weights: Optional[np.ndarray] = None) -> np.ndarray:
+    """Histogram over equal-width bins by scaling values straight to bin indices
+    
+    Matches np.histogram with bins=np.linspace(lo, hi, nbins + 1), including the
+    closed last bin, without the binary search over bin edges.
+    """
+    scale = nbins / (hi - lo) if hi > lo else 0.0
+    idx = ((values - lo) * scale).astype(np.intp)
+    np.clip(idx, 0, nbins - 1, out=idx)
+    return np.bincount(idx, weights=weights, minlength=nbins)
 
 class PhaseSeparationVisualizer:
     def __init__(self):
@@ -20,38 +53,47 @@ class PhaseSeparationVisualizer:
         for key, value in self.style_config.items():
             plt.rcParams[key] = value
 
-    def plot_phase_separation(self, states: List[MCState]):
+        # Figures are kept per plot and cleared for reuse on later calls
+        self._figures: Dict[str, plt.Figure] = {}
+
+    def _get_figure(self, name: str, nrows: int, ncols: int, figsize: tuple):
+        """Return a cleared figure for the named plot along with fresh axes"""
+        fig = self._figures.get(name)
+        if fig is None or not plt.fignum_exists(fig.number):
+            fig = plt.figure(figsize=figsize)
+            self._figures[name] = fig
+        else:
+            fig.clear()
+        return fig, fig.subplots(nrows, ncols)
+
+    def plot_phase_separation(self, states: States):
         """Plot phase separation probabilities and transitions"""
-        temperatures = [s.temperature for s in states]
-        phases = [s.phase for s in states]
+        batch = _as_batch(states)
+        temperatures = batch.temperature
         
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
+        fig, (ax1, ax2) = self._get_figure('phase_separation', 2, 1, figsize=(12, 10))
         
         # Phase separation probability
-        unique_phases = list(set(phases)) if phases else ['coherent']
+        # Unique phase codes plus dense ids for counting; legend follows code order
+        unique_codes, phase_ids = np.unique(batch.phase, return_inverse=True)
+        unique_phases = [decode_phase(code) for code in unique_codes] or ['coherent']
         if len(temperatures) < 2:
             print("Not enough data points for visualization")
             return fig
         
-        temp_bins = np.linspace(min(temperatures), max(temperatures), 30)
+        temp_bins = np.linspace(temperatures.min(), temperatures.max(), 30)
         bin_centers = (temp_bins[:-1] + temp_bins[1:]) / 2  # Use bin centers for plotting
         
         plotted_something = False  # Flag to track if we plotted anything
         
-        for phase in unique_phases:
-            probs = np.zeros(len(temp_bins) - 1)
-            errors = np.zeros(len(temp_bins) - 1)
-            
-            for i in range(len(temp_bins)-1):
-                mask = (np.array(temperatures) >= temp_bins[i]) & \
-                      (np.array(temperatures) < temp_bins[i+1])
-                if sum(mask) == 0:
-                    continue
-                
-                phase_count = sum(1 for p in np.array(phases)[mask] if p == phase)
-                total = sum(mask)
-                probs[i] = phase_count / total if total > 0 else 0
-                errors[i] = np.sqrt(probs[i] * (1-probs[i]) / total) if total > 0 and probs[i] > 0 else 0
+        n_bins, t_min, t_max = len(temp_bins) - 1, temp_bins[0], temp_bins[-1]
+        total = _uniform_hist(temperatures, n_bins, t_min, t_max)
+        
+        for phase_id, phase in enumerate(unique_phases):
+            phase_counts = _uniform_hist(temperatures, n_bins, t_min, t_max,
+                                         weights=(phase_ids == phase_id).astype(np.float64))
+            probs = phase_counts / np.maximum(total, 1)
+            errors = _binomial_error(probs, total)
             
             if np.any(probs > 0):
                 ax1.plot(bin_centers, probs, '-', label=f'Phase: {phase}', alpha=0.7)
@@ -74,14 +116,21 @@ class PhaseSeparationVisualizer:
         ax1.set_title('Phase Separation Analysis')
         
         # Phase transition density
-        transitions = [1 if i > 0 and phases[i] != phases[i-1] else 0 
-                      for i in range(len(phases))]
-        
-        if sum(transitions) > 1:  # Only compute KDE if we have transitions
-            kde = gaussian_kde(np.array(temperatures)[np.array(transitions) == 1])
-            x_range = np.linspace(min(temperatures), max(temperatures), 100)
-            density = kde(x_range)
-            density = density / np.trapz(density, x_range)  # Normalize to 1
+        transition_temps = temperatures[1:][phase_ids[1:] != phase_ids[:-1]]
+        
+        if len(transition_temps) > 1:  # Only compute KDE if we have transitions
+            # Gaussian KDE as a histogram on a fine grid smoothed with a Gaussian
+            # kernel; cost depends on the grid size, not the transition count
+            counts, edges = np.histogram(transition_temps, bins=KDE_GRID_SIZE,
+                                         range=(temperatures.min(), temperatures.max()))
+            bin_width = edges[1] - edges[0]
+            bandwidth = transition_temps.std(ddof=1) * len(transition_temps) ** (-1 / 5)  # Scott's rule
+            # Transitions that all share one temperature give zero spread;
+            # smooth over at least one bin so the density stays finite
+            bandwidth = max(bandwidth, bin_width)
+            density = gaussian_filter1d(counts.astype(float), sigma=bandwidth / bin_width, mode='constant')
+            density = density / (density.sum() * bin_width)  # Normalize to 1
+            x_range = (edges[:-1] + edges[1:]) / 2
             
             ax2.plot(x_range, density)
             ax2.fill_between(x_range, density, alpha=0.3)
@@ -95,86 +144,81 @@ class PhaseSeparationVisualizer:
         ax2.set_ylabel('Transition Density')
         ax2.set_title('Phase Transition Density')
         
-        plt.tight_layout()
+        fig.tight_layout()
         return fig
 
-    def plot_free_energy_landscape(self, states: List[MCState]):
-        temperatures = [s.temperature for s in states]
-        energies = [s.energy for s in states]
-        phases = [s.phase for s in states]
-        entropies = [s.entropy for s in states]  # Add new metrics
-        enthalpies = [s.enthalpy for s in states]
-        coherences = [s.coherence for s in states]
-        
-        fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 12))
-        
-        # Energy vs Temperature plot
-        self._scatter_plot(ax1, temperatures, energies, phases, 
-                          'Temperature', 'Energy', 'Energy Landscape')
+    def plot_free_energy_landscape(self, states: States):
+        # Work on the batch's columns; the scatter helper only masks these arrays
+        batch = _as_batch(states)
+        temperatures = batch.temperature
+        phases = batch.phase
+        
+        # Metric plotted against temperature in each panel, in axes order
+        metrics = {
+            'Energy': (batch.energy, 'Energy Landscape'),
+            'Entropy': (batch.entropy, 'Entropy Analysis'),
+            'Enthalpy': (batch.enthalpy, 'Enthalpy Analysis'),
+            'Coherence': (batch.coherence, 'Coherence Analysis')
+        }
         
-        # Entropy vs Temperature plot
-        self._scatter_plot(ax2, temperatures, entropies, phases,
-                          'Temperature', 'Entropy', 'Entropy Analysis')
+        # Build each phase's mask and temperature selection once and share
+        # them across all four panels
+        phase_points = []
+        for phase, style in PHASE_STYLES.items():
+            mask = phases == PHASE_CODES[phase]
+            if mask.any():
+                phase_points.append((style, mask, temperatures[mask]))
         
-        # Enthalpy vs Temperature plot
-        self._scatter_plot(ax3, temperatures, enthalpies, phases,
-                          'Temperature', 'Enthalpy', 'Enthalpy Analysis')
+        fig, axes = self._get_figure('free_energy', 2, 2, figsize=(15, 12))
         
-        # Coherence vs Temperature plot
-        self._scatter_plot(ax4, temperatures, coherences, phases,
-                          'Temperature', 'Coherence', 'Coherence Analysis')
+        for ax, (ylabel, (values, title)) in zip(axes.flat, metrics.items()):
+            self._scatter_plot(ax, phase_points, values, 'Temperature', ylabel, title)
         
-        plt.tight_layout()
+        fig.tight_layout()
         return fig
 
-    def _scatter_plot(self, ax, x, y, phases, xlabel, ylabel, title):
-        """Helper method for creating scatter plots with phase coloring"""
-        phase_styles = {
-            'coherent': {'color': 'blue', 'marker': 'o', 'label': 'Coherent'},
-            'chaotic': {'color': 'red', 'marker': '^', 'label': 'Chaotic'},
-            'semi-coherent': {'color': 'green', 'marker': 's', 'label': 'Semi-coherent'}
-        }
+    def _scatter_plot(self, ax, phase_points: List[tuple], y: np.ndarray,
+                      xlabel, ylabel, title):
+        """Helper method for creating scatter plots with phase coloring
         
+        phase_points holds (PHASE_STYLES entry, boolean mask, masked x values)
+        triples for the phases present in y.
+        """
         # Plot points for each phase
-        for phase, style in phase_styles.items():
-            mask = np.array(phases) == phase
-            if sum(mask) > 0:  # Only plot if we have points for this phase
-                ax.scatter(np.array(x)[mask], 
-                          np.array(y)[mask],
-                          c=style['color'],
-                          marker=style['marker'],
-                          label=style['label'],
-                          alpha=0.6)
+        for style, mask, x in phase_points:
+            ax.scatter(x, 
+                      y[mask],
+                      c=style['color'],
+                      marker=style['marker'],
+                      label=style['label'],
+                      alpha=0.6,
+                      rasterized=True)  # One bitmap instead of a path per marker
         
         ax.set_xlabel(xlabel)
         ax.set_ylabel(ylabel)
         ax.set_title(title)
         ax.legend()
 
-    def plot_phase_stability_matrix(self, states: List[MCState]):
+    def plot_phase_stability_matrix(self, states: States):
         """Plot phase stability matrix showing transition probabilities"""
-        phases = [s.phase for s in states]
+        codes = _as_batch(states).phase
         # Reorder phases to put semi-coherent in the middle
-        phase_order = ['coherent', 'semi-coherent', 'chaotic']
+        phase_order = list(PHASE_CODES)
         n_phases = len(phase_order)
         
-        # Create transition matrix with ordered phases
-        transition_matrix = np.zeros((n_phases, n_phases))
-        phase_to_idx = {phase: i for i, phase in enumerate(phase_order)}
-        
-        for i in range(len(phases)-1):
-            if phases[i] in phase_to_idx and phases[i+1] in phase_to_idx:
-                current_idx = phase_to_idx[phases[i]]
-                next_idx = phase_to_idx[phases[i+1]]
-                transition_matrix[current_idx, next_idx] += 1
+        # Create transition matrix with ordered phases by counting flattened
+        # (from, to) pairs, skipping pairs that involve a fallback or unrecognized phase
+        current, following = codes[:-1].astype(np.intp), codes[1:].astype(np.intp)
+        known = (codes >= 0) & (codes < n_phases)
+        flat = (current * n_phases + following)[known[:-1] & known[1:]]
+        transition_matrix = np.bincount(flat, minlength=n_phases**2).reshape(n_phases, n_phases).astype(float)
         
         # Normalize
         row_sums = transition_matrix.sum(axis=1, keepdims=True)
-        transition_matrix = np.divide(transition_matrix, row_sums, 
-                                    where=row_sums!=0)
+        np.divide(transition_matrix, row_sums, out=transition_matrix, where=row_sums != 0)
         
         # Plot with consistent ordering
-        fig, ax = plt.subplots(figsize=(8, 6))
+        fig, ax = self._get_figure('stability_matrix', 1, 1, figsize=(8, 6))
         im = ax.imshow(transition_matrix, cmap='viridis')
         
         # Set both axes with the same order
@@ -189,17 +233,10 @@ class PhaseSeparationVisualizer:
         ax.set_ylabel('From Phase')  # y-axis = rows = starting phase
         
         # Add colorbar
-        plt.colorbar(im, label='Transition Probability')
+        fig.colorbar(im, ax=ax, label='Transition Probability')
         
         # Add statistical uncertainty
-        transition_counts = transition_matrix * row_sums
-        uncertainty = np.zeros_like(transition_matrix)
-        for i in range(n_phases):
-            for j in range(n_phases):
-                if row_sums[i] > 0:
-                    p = transition_matrix[i,j]
-                    n = row_sums[i][0]
-                    uncertainty[i,j] = np.sqrt(p * (1-p) / n)
+        uncertainty = _binomial_error(transition_matrix, row_sums)
         
         # Add annotations with uncertainties
         for i in range(n_phases):
@@ -208,12 +245,12 @@ class PhaseSeparationVisualizer:
                     text = f'{transition_matrix[i,j]:.2f}\n±{uncertainty[i,j]:.2f}'
                     ax.text(j, i, text, ha='center', va='center')
         
-        plt.tight_layout()
+        fig.tight_layout()
         return fig 
 
 def generate_visualizations(states_file: str, output_dir: str):
     """Generate and save all visualizations for a given states file"""
-    import json
+    import orjson
     import os
     from datetime import datetime
     
@@ -221,20 +258,11 @@ def generate_visualizations(states_file: str, output_dir: str):
     os.makedirs(output_dir, exist_ok=True)
     
     # Load states from JSON
-    with open(states_file, 'r') as f:
-        states_data = json.load(f)
-    
-    # Convert JSON data to MCState-like objects
-    class MCState:
-        def __init__(self, data):
-            self.temperature = data['temperature']
-            self.energy = data['energy']
-            self.entropy = data['entropy']
-            self.enthalpy = data['enthalpy']
-            self.coherence = data['coherence']
-            self.phase = data['phase']
+    with open(states_file, 'rb') as f:
+        states_data = orjson.loads(f.read())
     
-    states = [MCState(state) for state in states_data]
+    # Convert JSON data straight to columns
+    states = MCStateBatch.from_json(states_data)
     
     # Create visualizer
     viz = PhaseSeparationVisualizer()
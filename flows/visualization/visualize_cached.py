@@ -1,54 +1,66 @@
-import json
+import orjson
 import asyncio
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple
+import os
+import matplotlib
+matplotlib.use('Agg')  # Non-interactive backend; figures are only written to disk
 import matplotlib.pyplot as plt
 import numpy as np
 from flows.visualization.phase_separation_viz import PhaseSeparationVisualizer
 from flows.visualization.monte_carlo_viz import MonteCarloVisualizer
 from flows.core.monte_carlo import MCState
+from flows.core.types import MCStateBatch
+from flows.core.data_storage import load_generation_file
+
+# Pulls state fields out in MCState's positional order
+_state_fields = itemgetter(
+    'temperature', 'energy', 'entropy', 'enthalpy', 'coherence',
+    'personality', 'phase', 'response'
+)
+
+def _load_states(file_path: Path) -> Optional[Tuple[Dict, List[MCState]]]:
+    """Load a single generation file into its metadata and MCStates
+    
+    Returns None if the file can't be read or parsed.
+    """
+    try:
+        data = load_generation_file(file_path)
+        # Extract metadata and states
+        metadata = data.get('metadata', {})
+        states = []
+        for state in data.get('states', []):
+            # Create MCState object from each state entry
+            mc_state = MCState(*_state_fields(state))
+            states.append(mc_state)
+            print(f"Processed state with temperature: {mc_state.temperature}")
+        return metadata, states
+    except orjson.JSONDecodeError:
+        print(f"Warning: Skipping invalid JSON file: {file_path}")
+    except KeyError as e:
+        print(f"Warning: Missing required field {e} in file: {file_path}")
+    except Exception as e:
+        print(f"Error processing file {file_path}: {str(e)}")
+    return None
 
 async def main():
-    # Read generations
+    # Read generations; files are independent so read and parse them in parallel
     generations_dir = Path('data/generations')
-    all_states = []
+    results = await asyncio.gather(*[
+        asyncio.to_thread(_load_states, file_path)
+        for file_path in generations_dir.glob('*.json*')
+    ])
+    loaded = [result for result in results if result is not None]
+    all_states = list(chain.from_iterable(states for _, states in loaded))
     
-    for file_path in generations_dir.glob('*.json'):
-        try:
-            with open(file_path, 'r') as f:
-                try:
-                    data = json.load(f)
-                    # Extract metadata and states
-                    metadata = data.get('metadata', {})
-                    states = data.get('states', [])
-                    
-                    # Get experiment parameters
-                    experiment_id = metadata.get('experiment_id')
-                    timestamp = metadata.get('timestamp')
-                    parameters = metadata.get('parameters', {})
-                    model_info = metadata.get('model', {})
-                    
-                    for state in states:
-                        # Create MCState object from each state entry
-                        mc_state = MCState(
-                            temperature=float(state['temperature']),
-                            energy=float(state['energy']),
-                            entropy=float(state['entropy']),
-                            enthalpy=float(state['enthalpy']),
-                            coherence=float(state['coherence']),
-                            personality=state['personality'],
-                            phase=state['phase'],
-                            response=state['response']
-                        )
-                        all_states.append(mc_state)
-                        print(f"Processed state with temperature: {mc_state.temperature}")
-                except json.JSONDecodeError:
-                    print(f"Warning: Skipping invalid JSON file: {file_path}")
-                except KeyError as e:
-                    print(f"Warning: Missing required field {e} in file: {file_path}")
-        except Exception as e:
-            print(f"Error processing file {file_path}: {str(e)}")
-            continue
+    # Get experiment parameters
+    metadata = loaded[-1][0] if loaded else {}
+    experiment_id = metadata.get('experiment_id')
+    timestamp = metadata.get('timestamp')
 
     if not all_states:
         print("No valid states were loaded. Please check your data files.")
@@ -71,18 +83,16 @@ async def main():
     mc_viz.plot_phase_stability(all_states)
     await mc_viz.plot_personality_evolution(all_states)
     
-    # Phase separation visualizations
-    phase_viz.plot_phase_separation(all_states)
-    phase_viz.plot_free_energy_landscape(all_states)
-    phase_viz.plot_phase_stability_matrix(all_states)
+    # Phase separation visualizations share one columnar extraction
+    state_batch = MCStateBatch.from_states(all_states)
+    phase_viz.plot_phase_separation(state_batch)
+    phase_viz.plot_free_energy_landscape(state_batch)
+    phase_viz.plot_phase_stability_matrix(state_batch)
     
     # Save all plots
     save_plots("phase_analysis")
     
     print("\nVisualization complete. Plots saved to 'plots' directory.")
-    
-    # Show all plots
-    plt.show()
 
 def save_plots(experiment_name: str):
     """Save all plots to files with timestamp"""
@@ -90,9 +100,8 @@ def save_plots(experiment_name: str):
     plots_dir = Path("plots")
     plots_dir.mkdir(exist_ok=True)
     
-    # Save each figure with a descriptive name
-    for i, fig in enumerate(plt.get_fignums()):
-        figure = plt.figure(fig)
+    def save_figure(i: int, figure: plt.Figure):
+        """Save one figure with a descriptive name"""
         plot_type = {
             0: "thermodynamic_landscape",
             1: "phase_stability",
@@ -106,6 +115,12 @@ def save_plots(experiment_name: str):
         filepath = plots_dir / filename
         figure.savefig(filepath, dpi=300, bbox_inches='tight')
         print(f"Saved {plot_type} plot to {filepath}")
+        
+    # Look figures up here since pyplot's figure manager isn't thread-safe;
+    # Agg then renders each figure independently, so write them in parallel
+    figures = [plt.figure(fig) for fig in plt.get_fignums()]
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        list(executor.map(save_figure, range(len(figures)), figures))
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file